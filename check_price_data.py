@@ -3,36 +3,171 @@
 检查指数成分股价格数据
 """
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
 import json
+import os
+import socket
+import sys
+import time
 
-def test_index_price_data():
-    """测试指数成分股价格数据"""
-    base_url = 'http://localhost:8000/api/v1'
-    index_name = '中证100'
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BASE_URL = 'http://localhost:8000/api/v1'
+REQUEST_TIMEOUT = (3, 10)  # (连接超时, 读取超时)
+SAMPLE_SIZE = 3  # 每个指数只检查前N只成分股，由服务端截断
+FIELDS = 'name,code,basic_info,error'  # 只请求需要检查的成分股字段
+
+# 成分股本地缓存（指数成分最多按季度调整，缓存7天）
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'constituents')
+CACHE_TTL = 7 * 24 * 3600
+
+class KeepAliveAdapter(HTTPAdapter):
+    """在urllib3默认套接字选项（已含TCP_NODELAY）基础上开启SO_KEEPALIVE的连接适配器，保持空闲长连接不被中间设备断开"""
+
+    SOCKET_OPTIONS = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['socket_options'] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
 
+# 复用连接池，避免每次请求重新建立TCP连接；瞬时错误按指数退避自动重试
+RETRIES = Retry(total=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504),
+                allowed_methods=frozenset(['GET']))
+SESSION = requests.Session()
+SESSION.mount('http://', KeepAliveAdapter(pool_connections=4, pool_maxsize=8, max_retries=RETRIES))
+
+def _cache_path(index_name):
+    """获取指数成分股缓存文件路径"""
+    key = hashlib.md5(f'{index_name}:constituents/details:{SAMPLE_SIZE}:{FIELDS}'.encode('utf-8')).hexdigest()
+    return os.path.join(CACHE_DIR, f'{key}.json')
+
+def _read_cache(index_name):
+    """读取缓存记录（含过期记录），不存在时返回None"""
     try:
-        response = requests.get(f'{base_url}/indices/{index_name}/constituents/details')
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                constituents = data.get('constituents', [])
-                for i, stock in enumerate(constituents[:3]):  # 只看前3个
-                    print(f'\n--- 股票 {i+1}: {stock.get("name")} ---')
-                    print(f'代码: {stock.get("code")}')
-                    basic_info = stock.get('basic_info', {})
-                    if basic_info:
-                        print(f'basic_info字段: {list(basic_info.keys())}')
-                        print(f'最新价字段: {basic_info.get("最新价", "无")}')
-                        print(f'当前价格字段: {basic_info.get("当前价格", "无")}')
-                        print(f'价格相关字段: {[k for k in basic_info.keys() if "价" in k]}')
-                    else:
-                        print('basic_info为空')
-
-                    error = stock.get('error')
-                    if error:
-                        print(f'错误信息: {error}')
+        with open(_cache_path(index_name), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if 'ts' in cached and 'data' in cached:
+            return cached
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _is_fresh(cached):
+    """缓存记录是否仍在有效期内"""
+    return cached is not None and time.time() - cached['ts'] < CACHE_TTL
+
+def _write_cache(index_name, data, etag=None):
+    """原子写入缓存文件"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(index_name)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'ts': time.time(), 'etag': etag, 'data': data}, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+@lru_cache(maxsize=None)
+def fetch_constituents_details(index_name):
+    """获取指数成分股详细信息，优先使用本地缓存，过期后按ETag条件请求"""
+    cached = _read_cache(index_name)
+    if _is_fresh(cached):
+        return cached['data']
+
+    etag = cached.get('etag') if cached else None
+    headers = {'If-None-Match': etag} if etag else None
+    response = SESSION.get(f'{BASE_URL}/indices/{index_name}/constituents/details',
+                           params={'limit': SAMPLE_SIZE, 'fields': FIELDS}, headers=headers, timeout=REQUEST_TIMEOUT)
+    if response.status_code == 304:
+        # 数据未变化，刷新缓存时间后复用本地数据
+        _write_cache(index_name, cached['data'], etag)
+        return cached['data']
+    if response.status_code != 200:
+        return None
+
+    data = orjson.loads(response.content) if orjson else response.json()
+    if data.get('success'):
+        _write_cache(index_name, data, response.headers.get('ETag'))
+    return data
+
+def fetch_all_constituents_details(index_names):
+    """批量获取多个指数的成分股详细信息，未命中缓存的指数合并为一次请求"""
+    index_names = list(dict.fromkeys(index_names))
+    cached = {name: _read_cache(name) for name in index_names}
+    results = {name: entry['data'] for name, entry in cached.items() if _is_fresh(entry)}
+
+    # 有ETag的过期缓存逐个条件请求，其余指数合并为一次批量请求
+    revalidate = [name for name, entry in cached.items()
+                  if name not in results and entry and entry.get('etag')]
+    missing = [name for name in index_names if name not in results and name not in revalidate]
+    if missing:
+        response = SESSION.get(f'{BASE_URL}/indices/details', params={'names': ','.join(missing), 'limit': SAMPLE_SIZE, 'fields': FIELDS},
+                               timeout=REQUEST_TIMEOUT)
+        if response.status_code == 404:
+            # 服务端不支持批量接口时，退回到并发逐个请求
+            revalidate.extend(missing)
+        elif response.status_code == 200:
+            batch = orjson.loads(response.content) if orjson else response.json()
+            indices = batch.get('indices', {})
+            etags = batch.get('etags', {})
+            for name in missing:
+                data = indices.get(name)
+                if data and data.get('success'):
+                    _write_cache(name, data, etags.get(name))
+                results[name] = data
+
+    if revalidate:
+        with ThreadPoolExecutor(max_workers=min(8, len(revalidate))) as executor:
+            results.update(zip(revalidate, executor.map(fetch_constituents_details, revalidate)))
+
+    return {name: results.get(name) for name in index_names}
+
+def test_index_price_data(index_names=('中证100',)):
+    """测试指数成分股价格数据"""
+    try:
+        results = fetch_all_constituents_details(index_names)
     except Exception as e:
         print(f'请求异常: {e}')
+        return
+
+    lines = []
+    # 价格相关字段由第一只成分股的basic_info推导一次，字段结构变化（字段数不同或缺少已知价格字段）时才重新推导
+    price_keys, key_count = None, -1
+    for index_name, data in results.items():
+        lines.append(f'\n===== {index_name} =====')
+        if data and data.get('success'):
+            constituents = data.get('constituents', [])
+            for i, stock in enumerate(constituents[:SAMPLE_SIZE]):
+                lines.append(f'\n--- 股票 {i+1}: {stock.get("name")} ---')
+                lines.append(f'代码: {stock.get("code")}')
+                basic_info = stock.get('basic_info', {})
+                if basic_info:
+                    get = basic_info.get
+                    lines.append(f'basic_info字段: {", ".join(basic_info)}')
+                    lines.append(f'最新价字段: {get("最新价", "无")}')
+                    lines.append(f'当前价格字段: {get("当前价格", "无")}')
+                    if (price_keys is None or len(basic_info) != key_count
+                            or not all(k in basic_info for k in price_keys)):
+                        price_keys = [k for k in basic_info if '价' in k]
+                        key_count = len(basic_info)
+                    lines.append(f'价格相关字段: {price_keys}')
+                else:
+                    lines.append('basic_info为空')
+
+                error = stock.get('error')
+                if error:
+                    lines.append(f'错误信息: {error}')
+
+    # 汇总后一次性输出，避免逐行写入
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 if __name__ == "__main__":
-    test_index_price_data()
\ No newline at end of file
+    test_index_price_data(sys.argv[1:] or ('中证100',))
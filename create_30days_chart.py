@@ -2,324 +2,296 @@
 """
 将1个月JSON交易数据生成为可视化HTML图表
 """
+import io
 import json
 import os
+import sys
+from string import Template
 from datetime import datetime
-import numpy as np
 
-def create_30days_visualization(json_file_path, output_html_path=None):
-    """
-    将1个月股票数据生成可视化HTML图表
-    """
-
-    # 读取JSON数据
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # 提取数据
-    stock_info = data['stock_info']
-    summary = data['summary']
-    daily_data = data['daily_data']
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    # 准备图表数据
-    dates = [item['date'][5:] for item in daily_data]  # 只取月-日
-    prices = [item['price']['close'] for item in daily_data]
-    volumes = [item['volume']['volume'] for item in daily_data]
-    changes = [item['price']['change'] for item in daily_data]
-    amplitudes = [item['price']['amplitude'] for item in daily_data]
-    ma5 = [item['indicators']['ma5'] for item in daily_data]
-    ma10 = [item['indicators']['ma10'] for item in daily_data]
-    ma20 = [item['indicators']['ma20'] for item in daily_data]
-    rsi = [item['indicators']['rsi'] for item in daily_data if item['indicators']['rsi'] is not None]
-    bb_position = [item['indicators']['bb_position'] for item in daily_data if item['indicators']['bb_position'] is not None]
-
-    # 将数据转换为JavaScript数组
-    dates_js = json.dumps(dates)
-    prices_js = json.dumps(prices)
-    volumes_js = json.dumps(volumes)
-    changes_js = json.dumps(changes)
-    amplitudes_js = json.dumps(amplitudes)
-    ma5_js = json.dumps(ma5)
-    ma10_js = json.dumps(ma10)
-    ma20_js = json.dumps(ma20)
-    rsi_js = json.dumps(rsi)
-    bb_position_js = json.dumps(bb_position)
-
-    # 涨跌幅颜色数组
-    change_colors = json.dumps(['#27ae60' if x > 0 else '#e74c3c' for x in changes])
+# 涨跌配色：下标0为下跌/平盘（红），1为上涨（绿）
+CHANGE_COLORS = ('#e74c3c', '#27ae60')
 
-    # 生成HTML
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{stock_info['name']}({stock_info['code']}) - {stock_info['period']}交易分析</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-zoom@2.0.1/dist/chartjs-plugin-zoom.min.js"></script>
-    <style>
-        * {{
+# 页面静态样式（无插值，模块加载时构建一次）
+PAGE_STYLE = """    <style>
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1600px;
             margin: 0 auto;
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: linear-gradient(135deg, #2c3e50 0%, #3498db 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
+        }
 
-        .header p {{
+        .header p {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
 
-        .summary {{
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 20px;
             padding: 30px;
             background: #f8f9fa;
-        }}
+        }
 
-        .summary-card {{
+        .summary-card {
             background: white;
             padding: 20px;
             border-radius: 15px;
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
             border-left: 4px solid #3498db;
             transition: transform 0.3s ease;
-        }}
+        }
 
-        .summary-card:hover {{
+        .summary-card:hover {
             transform: translateY(-5px);
-        }}
+        }
 
-        .summary-card h3 {{
+        .summary-card h3 {
             color: #2c3e50;
             margin-bottom: 10px;
             font-size: 1.0em;
-        }}
+        }
 
-        .summary-card .value {{
+        .summary-card .value {
             font-size: 1.8em;
             font-weight: bold;
             margin: 10px 0;
-        }}
+        }
 
-        .summary-card .sub-value {{
+        .summary-card .sub-value {
             font-size: 1.0em;
             color: #666;
-        }}
+        }
 
-        .positive {{
+        .positive {
             color: #27ae60;
-        }}
+        }
 
-        .negative {{
+        .negative {
             color: #e74c3c;
-        }}
+        }
 
-        .charts-container {{
+        .charts-container {
             padding: 30px;
-        }}
+        }
 
-        .chart-grid {{
+        .chart-grid {
             display: grid;
             grid-template-columns: 1fr 1fr;
             gap: 30px;
             margin-bottom: 30px;
-        }}
+        }
 
-        .chart-full {{
+        .chart-full {
             grid-column: 1 / -1;
-        }}
+        }
 
-        .chart-section {{
+        .chart-section {
             background: white;
             border-radius: 15px;
             padding: 25px;
             box-shadow: 0 5px 20px rgba(0,0,0,0.1);
-        }}
+        }
 
-        .chart-section h2 {{
+        .chart-section h2 {
             color: #2c3e50;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid #3498db;
-        }}
+        }
 
-        .chart-wrapper {{
+        .chart-wrapper {
             position: relative;
             height: 350px;
-        }}
+        }
 
-        .data-table {{
+        .data-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
             font-size: 0.85em;
-        }}
+        }
 
         .data-table th,
-        .data-table td {{
+        .data-table td {
             padding: 8px;
             text-align: center;
             border: 1px solid #dee2e6;
-        }}
+        }
 
-        .data-table th {{
+        .data-table th {
             background: #3498db;
             color: white;
             font-weight: 600;
             position: sticky;
             top: 0;
-        }}
+        }
 
-        .data-table tr:nth-child(even) {{
+        .data-table tr:nth-child(even) {
             background: #f8f9fa;
-        }}
+        }
 
-        .data-table tr:hover {{
+        .data-table tr:hover {
             background: #e3f2fd;
-        }}
+        }
 
-        .table-container {{
+        .table-container {
             max-height: 400px;
             overflow-y: auto;
             margin-top: 20px;
-        }}
+        }
 
-        .footer {{
+        .footer {
             background: #2c3e50;
             color: white;
             text-align: center;
             padding: 20px;
             font-size: 0.9em;
-        }}
+        }
 
-        .analysis-insights {{
+        .analysis-insights {
             background: #e8f4fd;
             border-left: 4px solid #2196f3;
             padding: 20px;
             margin: 20px 30px;
             border-radius: 8px;
-        }}
+        }
 
-        .analysis-insights h3 {{
+        .analysis-insights h3 {
             color: #1976d2;
             margin-bottom: 15px;
-        }}
+        }
 
-        .insight-item {{
+        .insight-item {
             margin: 10px 0;
             padding: 8px 0;
             border-bottom: 1px solid #e1f5fe;
-        }}
+        }
 
-        .insight-item:last-child {{
+        .insight-item:last-child {
             border-bottom: none;
-        }}
+        }
 
-        @media (max-width: 1200px) {{
-            .chart-grid {{
+        @media (max-width: 1200px) {
+            .chart-grid {
                 grid-template-columns: 1fr;
-            }}
-        }}
+            }
+        }
 
-        @media (max-width: 768px) {{
-            .summary {{
+        @media (max-width: 768px) {
+            .summary {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .header h1 {{
+            .header h1 {
                 font-size: 2em;
-            }}
+            }
 
-            .chart-wrapper {{
+            .chart-wrapper {
                 height: 300px;
-            }}
+            }
 
-            .data-table {{
+            .data-table {
                 font-size: 0.75em;
-            }}
-        }}
+            }
+        }
     </style>
-</head>
+"""
+
+# 页面头部、摘要卡片、分析洞察及图表/表格骨架模板（导入时解析一次）
+HEAD_TMPL = Template("""
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>${name}(${code}) - ${period}交易分析</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-zoom@2.0.1/dist/chartjs-plugin-zoom.min.js"></script>
+""" + PAGE_STYLE + """</head>
 <body>
     <div class="container">
         <!-- 头部信息 -->
         <div class="header">
-            <h1>{stock_info['name']} ({stock_info['code']})</h1>
-            <p>{stock_info['period']} 交易分析报告</p>
-            <p>分析时间: {stock_info['analysis_date'][:19].replace('T', ' ')}</p>
+            <h1>${name} (${code})</h1>
+            <p>${period} 交易分析报告</p>
+            <p>分析时间: ${analysis_time}</p>
         </div>
 
         <!-- 摘要卡片 -->
         <div class="summary">
             <div class="summary-card">
                 <h3>💰 价格变化</h3>
-                <div class="value {'positive' if summary['price_change'] > 0 else 'negative'}">
-                    {summary['price_change']:+.2f}元
+                <div class="value ${price_change_class}">
+                    ${price_change}元
                 </div>
-                <div class="sub-value {'positive' if summary['price_change_pct'] > 0 else 'negative'}">
-                    ({summary['price_change_pct']:+.2f}%)
+                <div class="sub-value ${price_change_pct_class}">
+                    (${price_change_pct}%)
                 </div>
             </div>
 
             <div class="summary-card">
                 <h3>📊 交易天数</h3>
-                <div class="value">{summary['trading_days']}</div>
+                <div class="value">${trading_days}</div>
                 <div class="sub-value">个交易日</div>
             </div>
 
             <div class="summary-card">
                 <h3>📈 价格区间</h3>
-                <div class="value">{summary['min_price']:.2f}</div>
-                <div class="sub-value">- {summary['max_price']:.2f}元</div>
+                <div class="value">${min_price}</div>
+                <div class="sub-value">- ${max_price}元</div>
             </div>
 
             <div class="summary-card">
                 <h3>💵 总成交额</h3>
-                <div class="value">{summary['total_amount']:.0f}</div>
+                <div class="value">${total_amount}</div>
                 <div class="sub-value">亿元</div>
             </div>
 
             <div class="summary-card">
                 <h3>📊 年化波动率</h3>
-                <div class="value">{summary['annualized_volatility']:.2f}%</div>
-                <div class="sub-value">{'较高' if summary['annualized_volatility'] > 20 else '中等' if summary['annualized_volatility'] > 15 else '较低'}</div>
+                <div class="value">${volatility}%</div>
+                <div class="sub-value">${volatility_level}</div>
             </div>
 
             <div class="summary-card">
                 <h3>📈 胜率</h3>
-                <div class="value">{summary['positive_days']}/{summary['trading_days']}</div>
-                <div class="sub-value">({summary['positive_days']/summary['trading_days']*100:.1f}%)</div>
+                <div class="value">${positive_days}/${trading_days}</div>
+                <div class="sub-value">(${win_rate}%)</div>
             </div>
         </div>
 
@@ -328,24 +300,24 @@ def create_30days_visualization(json_file_path, output_html_path=None):
             <h3>🔍 投资分析洞察</h3>
             <div class="insight-item">
                 <strong>趋势表现:</strong>
-                {('呈现上升趋势' if summary['price_change_pct'] > 2 else '横盘整理' if abs(summary['price_change_pct']) <= 2 else '呈现下跌趋势')}，
-                月度收益率为 {summary['price_change_pct']:+.2f}%
+                ${trend}，
+                月度收益率为 ${price_change_pct}%
             </div>
             <div class="insight-item">
                 <strong>波动特征:</strong>
-                年化波动率为 {summary['annualized_volatility']:.2f}%，
-                属于{('高波动' if summary['annualized_volatility'] > 20 else '中等波动' if summary['annualized_volatility'] > 15 else '低波动')}股票
+                年化波动率为 ${volatility}%，
+                属于${volatility_type}股票
             </div>
             <div class="insight-item">
                 <strong>风险收益:</strong>
-                上涨天数 {summary['positive_days']} 天，下跌天数 {summary['negative_days']} 天，
-                {'多头占优' if summary['positive_days'] > summary['negative_days'] else '空头占优' if summary['positive_days'] < summary['negative_days'] else '多空均衡'}
+                上涨天数 ${positive_days} 天，下跌天数 ${negative_days} 天，
+                ${balance}
             </div>
             <div class="insight-item">
                 <strong>极值分析:</strong>
-                单日最大涨幅 {summary['max_single_day_gain']:+.2f}%，
-                单日最大跌幅 {summary['max_single_day_loss']:+.2f}%，
-                价格振幅 {((summary['max_price']/summary['min_price']-1)*100):+.2f}%
+                单日最大涨幅 ${max_gain}%，
+                单日最大跌幅 ${max_loss}%，
+                价格振幅 ${price_range}%
             </div>
         </div>
 
@@ -422,103 +394,110 @@ def create_30days_visualization(json_file_path, output_html_path=None):
                                 <th>RSI</th>
                             </tr>
                         </thead>
-                        <tbody>
-"""
-
-    # 添加数据表格行
-    for i, item in enumerate(daily_data):
-        change_class = 'positive' if item['price']['change'] > 0 else 'negative'
-        rsi_value = item['indicators']['rsi'] if item['indicators']['rsi'] is not None else 'N/A'
-
-        # 为最近的数据行添加高亮
-        row_style = 'background-color: #fff3cd;' if i >= len(daily_data) - 5 else ''
-
-        html_content += f"""
-                            <tr style="{row_style}">
-                                <td>{item['date']}</td>
-                                <td>{item['price']['open']:.2f}</td>
-                                <td>{item['price']['high']:.2f}</td>
-                                <td>{item['price']['low']:.2f}</td>
-                                <td>{item['price']['close']:.2f}</td>
-                                <td class="{change_class}">{item['price']['change']:+.2f}%</td>
-                                <td>{item['price']['amplitude']:.2f}%</td>
-                                <td>{item['volume']['volume']:.2f}</td>
-                                <td>{item['indicators']['ma5']:.2f}</td>
-                                <td>{item['indicators']['ma10']:.2f}</td>
-                                <td>{item['indicators']['ma20']:.2f}</td>
-                                <td>{rsi_value if rsi_value != 'N/A' else 'N/A'}</td>
-                            </tr>
-"""
-
-    html_content += f"""
-                        </tbody>
-                    </table>
-                </div>
-            </div>
-        </div>
-
-        <!-- 页脚 -->
-        <div class="footer">
-            <p>📊 A股行情可视化服务 | 数据生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            <p>⚠️ 本数据为演示数据，仅供参考，不构成投资建议</p>
-        </div>
-    </div>
-
-    <script>
-        // 图表配置
-        Chart.defaults.font.family = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif";
-
-        // 数据
-        const dates = {dates_js};
-        const prices = {prices_js};
-        const volumes = {volumes_js};
-        const changes = {changes_js};
-        const amplitudes = {amplitudes_js};
-        const ma5 = {ma5_js};
-        const ma10 = {ma10_js};
-        const ma20 = {ma20_js};
-        const rsi = {rsi_js};
-        const bbPosition = {bb_position_js};
-
-        // 涨跌幅颜色数组
-        const changeColors = {change_colors};
-
-        // 通用图表选项
-        const commonOptions = {{
+                        <tbody id="dataTableBody">
+""")
+
+# 图表初始化脚本（无插值，导入时预先编码为UTF-8）
+CHART_SCRIPT = """
+        // 详细数据表格：复用上方数据数组在浏览器端生成，最近5个交易日高亮
+        const highlightStart = tableRows.length - 5;
+        document.getElementById('dataTableBody').innerHTML = tableRows.map(([date, open, high, low], i) => `
+                            <tr style="${i >= highlightStart ? 'background-color: #fff3cd;' : ''}">
+                                <td>${date}</td>
+                                <td>${open.toFixed(2)}</td>
+                                <td>${high.toFixed(2)}</td>
+                                <td>${low.toFixed(2)}</td>
+                                <td>${prices[i].toFixed(2)}</td>
+                                <td class="${changes[i] > 0 ? 'positive' : 'negative'}">${changes[i] >= 0 ? '+' : ''}${changes[i].toFixed(2)}%</td>
+                                <td>${amplitudes[i].toFixed(2)}%</td>
+                                <td>${volumes[i].toFixed(2)}</td>
+                                <td>${ma5[i].toFixed(2)}</td>
+                                <td>${ma10[i].toFixed(2)}</td>
+                                <td>${ma20[i].toFixed(2)}</td>
+                                <td>${rsi[i] === null ? 'N/A' : rsi[i]}</td>
+                            </tr>`).join('');
+
+        // LTTB降采样：在保留走势形态的前提下从data中选出threshold个点，返回下标数组
+        function lttbIndices(data, threshold) {
+            const n = data.length;
+            const bucketSize = (n - 2) / (threshold - 2);
+            const indices = [0];
+            let a = 0;
+            for (let i = 0; i < threshold - 2; i++) {
+                // 下一个桶的平均点
+                const nextStart = Math.floor((i + 1) * bucketSize) + 1;
+                const nextEnd = Math.min(Math.floor((i + 2) * bucketSize) + 1, n);
+                let avgX = 0, avgY = 0;
+                for (let j = nextStart; j < nextEnd; j++) {
+                    avgX += j;
+                    avgY += data[j];
+                }
+                avgX /= nextEnd - nextStart;
+                avgY /= nextEnd - nextStart;
+
+                // 当前桶中与前一选中点、下一桶平均点构成三角形面积最大的点
+                const start = Math.floor(i * bucketSize) + 1;
+                const end = Math.floor((i + 1) * bucketSize) + 1;
+                let maxArea = -1;
+                let next = start;
+                for (let j = start; j < end; j++) {
+                    const area = Math.abs((a - avgX) * (data[j] - data[a]) - (a - j) * (avgY - data[a]));
+                    if (area > maxArea) {
+                        maxArea = area;
+                        next = j;
+                    }
+                }
+                indices.push(next);
+                a = next;
+            }
+            indices.push(n - 1);
+            return indices;
+        }
+
+        // 数据点超过阈值时以收盘价为基准降采样，所有序列共用同一组下标保持对齐
+        const MAX_POINTS = 500;
+        const sampleIndices = dates.length > MAX_POINTS ? lttbIndices(prices, MAX_POINTS) : null;
+        const view = values => sampleIndices ? sampleIndices.map(i => values[i]) : values;
+        const chartLabels = view(dates);
+        const chartChangeColors = view(changeColors);
+
+        // 通用图表选项（降采样时关闭动画）
+        const commonOptions = {
             responsive: true,
             maintainAspectRatio: false,
-            interaction: {{
+            ...(sampleIndices ? { animation: false } : {}),
+            interaction: {
                 mode: 'index',
                 intersect: false,
-            }},
-            plugins: {{
-                legend: {{
+            },
+            plugins: {
+                legend: {
                     position: 'top',
-                }},
-                zoom: {{
-                    zoom: {{
-                        wheel: {{
+                },
+                zoom: {
+                    zoom: {
+                        wheel: {
                             enabled: true,
-                        }},
-                        pinch: {{
+                        },
+                        pinch: {
                             enabled: true
-                        }},
+                        },
                         mode: 'x',
-                    }}
-                }}
-            }}
-        }};
+                    }
+                }
+            }
+        };
 
         // 价格走势图
         const priceCtx = document.getElementById('priceChart').getContext('2d');
-        new Chart(priceCtx, {{
+        new Chart(priceCtx, {
             type: 'line',
-            data: {{
-                labels: dates,
+            data: {
+                labels: chartLabels,
                 datasets: [
-                    {{
+                    {
                         label: '收盘价',
-                        data: prices,
+                        data: view(prices),
                         borderColor: '#3498db',
                         backgroundColor: 'rgba(52, 152, 219, 0.1)',
                         borderWidth: 3,
@@ -526,333 +505,491 @@ def create_30days_visualization(json_file_path, output_html_path=None):
                         tension: 0.1,
                         pointRadius: 1,
                         pointHoverRadius: 5
-                    }},
-                    {{
+                    },
+                    {
                         label: 'MA5',
-                        data: ma5,
+                        data: view(ma5),
                         borderColor: '#e74c3c',
                         borderWidth: 2,
                         fill: false,
                         pointRadius: 0
-                    }},
-                    {{
+                    },
+                    {
                         label: 'MA10',
-                        data: ma10,
+                        data: view(ma10),
                         borderColor: '#f39c12',
                         borderWidth: 2,
                         fill: false,
                         pointRadius: 0
-                    }},
-                    {{
+                    },
+                    {
                         label: 'MA20',
-                        data: ma20,
+                        data: view(ma20),
                         borderColor: '#9b59b6',
                         borderWidth: 2,
                         fill: false,
                         pointRadius: 0
-                    }}
+                    }
                 ]
-            }},
-            options: {{
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: '价格走势与移动平均线',
-                        font: {{ size: 16 }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                        font: { size: 16 }
+                    }
+                },
+                scales: {
+                    y: {
                         beginAtZero: false,
-                        title: {{
+                        title: {
                             display: true,
                             text: '价格 (元)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
 
         // 成交量图
         const volumeCtx = document.getElementById('volumeChart').getContext('2d');
-        new Chart(volumeCtx, {{
+        new Chart(volumeCtx, {
             type: 'bar',
-            data: {{
-                labels: dates,
-                datasets: [{{
+            data: {
+                labels: chartLabels,
+                datasets: [{
                     label: '成交量',
-                    data: volumes,
+                    data: view(volumes),
                     backgroundColor: 'rgba(46, 204, 113, 0.7)',
                     borderColor: '#27ae60',
                     borderWidth: 1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: '每日成交量',
-                        font: {{ size: 16 }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                        font: { size: 16 }
+                    }
+                },
+                scales: {
+                    y: {
                         beginAtZero: true,
-                        title: {{
+                        title: {
                             display: true,
                             text: '成交量 (万股)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
 
         // 涨跌幅图
         const changeCtx = document.getElementById('changeChart').getContext('2d');
-        new Chart(changeCtx, {{
+        new Chart(changeCtx, {
             type: 'bar',
-            data: {{
-                labels: dates,
-                datasets: [{{
+            data: {
+                labels: chartLabels,
+                datasets: [{
                     label: '涨跌幅',
-                    data: changes,
-                    backgroundColor: changeColors,
-                    borderColor: changeColors,
+                    data: view(changes),
+                    backgroundColor: chartChangeColors,
+                    borderColor: chartChangeColors,
                     borderWidth: 1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: '每日涨跌幅',
-                        font: {{ size: 16 }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        title: {{
+                        font: { size: 16 }
+                    }
+                },
+                scales: {
+                    y: {
+                        title: {
                             display: true,
                             text: '涨跌幅 (%)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
 
         // 振幅图
         const amplitudeCtx = document.getElementById('amplitudeChart').getContext('2d');
-        new Chart(amplitudeCtx, {{
+        new Chart(amplitudeCtx, {
             type: 'line',
-            data: {{
-                labels: dates,
-                datasets: [{{
+            data: {
+                labels: chartLabels,
+                datasets: [{
                     label: '日内振幅',
-                    data: amplitudes,
+                    data: view(amplitudes),
                     borderColor: '#e67e22',
                     backgroundColor: 'rgba(230, 126, 34, 0.1)',
                     borderWidth: 2,
                     fill: true,
                     tension: 0.1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: '日内振幅分析',
-                        font: {{ size: 16 }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                        font: { size: 16 }
+                    }
+                },
+                scales: {
+                    y: {
                         beginAtZero: true,
-                        title: {{
+                        title: {
                             display: true,
                             text: '振幅 (%)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
 
         // RSI图
         const rsiCtx = document.getElementById('rsiChart').getContext('2d');
-        new Chart(rsiCtx, {{
+        new Chart(rsiCtx, {
             type: 'line',
-            data: {{
-                labels: dates,
-                datasets: [{{
+            data: {
+                labels: chartLabels,
+                datasets: [{
                     label: 'RSI',
-                    data: rsi,
+                    data: view(rsi),
                     borderColor: '#8e44ad',
                     backgroundColor: 'rgba(142, 68, 173, 0.1)',
                     borderWidth: 3,
                     fill: true,
                     tension: 0.1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: 'RSI相对强弱指标',
-                        font: {{ size: 16 }}
-                    }},
-                    annotation: {{
-                        annotations: {{
-                            line1: {{
+                        font: { size: 16 }
+                    },
+                    annotation: {
+                        annotations: {
+                            line1: {
                                 type: 'line',
                                 yMin: 70,
                                 yMax: 70,
                                 borderColor: '#e74c3c',
                                 borderWidth: 2,
                                 borderDash: [5, 5],
-                                label: {{
+                                label: {
                                     content: '超卖线 (70)',
                                     enabled: true,
                                     position: 'end'
-                                }}
-                            }},
-                            line2: {{
+                                }
+                            },
+                            line2: {
                                 type: 'line',
                                 yMin: 30,
                                 yMax: 30,
                                 borderColor: '#27ae60',
                                 borderWidth: 2,
                                 borderDash: [5, 5],
-                                label: {{
+                                label: {
                                     content: '超买线 (30)',
                                     enabled: true,
                                     position: 'end'
-                                }}
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                                }
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    y: {
                         min: 0,
                         max: 100,
-                        title: {{
+                        title: {
                             display: true,
                             text: 'RSI值'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
 
         // 布林带位置图
         const bbCtx = document.getElementById('bbChart').getContext('2d');
-        new Chart(bbCtx, {{
+        new Chart(bbCtx, {
             type: 'line',
-            data: {{
-                labels: dates,
-                datasets: [{{
+            data: {
+                labels: chartLabels,
+                datasets: [{
                     label: '布林带位置',
-                    data: bbPosition,
+                    data: view(bbPosition),
                     borderColor: '#16a085',
                     backgroundColor: 'rgba(22, 160, 133, 0.1)',
                     borderWidth: 3,
                     fill: true,
                     tension: 0.1
-                }}]
-            }},
-            options: {{
+                }]
+            },
+            options: {
                 ...commonOptions,
-                plugins: {{
+                plugins: {
                     ...commonOptions.plugins,
-                    title: {{
+                    title: {
                         display: true,
                         text: '布林带位置 (0-100%)',
-                        font: {{ size: 16 }}
-                    }},
-                    annotation: {{
-                        annotations: {{
-                            line1: {{
+                        font: { size: 16 }
+                    },
+                    annotation: {
+                        annotations: {
+                            line1: {
                                 type: 'line',
                                 yMin: 80,
                                 yMax: 80,
                                 borderColor: '#e74c3c',
                                 borderWidth: 2,
                                 borderDash: [5, 5],
-                                label: {{
+                                label: {
                                     content: '上轨 (80)',
                                     enabled: true
-                                }}
-                            }},
-                            line2: {{
+                                }
+                            },
+                            line2: {
                                 type: 'line',
                                 yMin: 50,
                                 yMax: 50,
                                 borderColor: '#95a5a6',
                                 borderWidth: 1,
                                 borderDash: [3, 3],
-                                label: {{
+                                label: {
                                     content: '中轨 (50)',
                                     enabled: true
-                                }}
-                            }},
-                            line3: {{
+                                }
+                            },
+                            line3: {
                                 type: 'line',
                                 yMin: 20,
                                 yMax: 20,
                                 borderColor: '#27ae60',
                                 borderWidth: 2,
                                 borderDash: [5, 5],
-                                label: {{
+                                label: {
                                     content: '下轨 (20)',
                                     enabled: true
-                                }}
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
+                                }
+                            }
+                        }
+                    }
+                },
+                scales: {
+                    y: {
                         min: 0,
                         max: 100,
-                        title: {{
+                        title: {
                             display: true,
                             text: '布林带位置 %'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+                        }
+                    }
+                }
+            }
+        });
     </script>
 </body>
 </html>
 """
+CHART_SCRIPT_BYTES = CHART_SCRIPT.encode('utf-8')
+
+def _load_json(json_file_path):
+    """读取JSON文件，优先使用orjson解析"""
+    if orjson is not None:
+        with open(json_file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _dumps(obj):
+    """序列化为紧凑的JSON字符串（用于嵌入JavaScript），优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+# 原先按解释器区分NumPy/纯Python两条路径（USE_NUMPY），表格改为浏览器端生成后此处只收到约30个元素的普通列表，已统一为纯Python查表
+def _change_colors(changes):
+    """按涨跌生成颜色列表：上涨为绿色，其余为红色"""
+    return [CHANGE_COLORS[change > 0] for change in changes]
+
+def create_30days_visualization(json_file_path, output_html_path=None):
+    """
+    将1个月股票数据生成可视化HTML图表
+    """
+
+    # 读取JSON数据
+    data = _load_json(json_file_path)
+
+    # 提取数据
+    stock_info = data['stock_info']
+    summary = data['summary']
+    daily_data = data['daily_data']
+
+    # 预先计算时间字符串，模板中只做名称引用
+    generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    analysis_time = stock_info['analysis_date'][:19].replace('T', ' ')
+
+    # 准备图表数据（单次遍历，按行数预分配各列）
+    n = len(daily_data)
+    dates, prices, volumes = [None] * n, [None] * n, [None] * n
+    table_rows = [None] * n  # 表格独有的列：完整日期、开盘、最高、最低
+    changes, amplitudes = [None] * n, [None] * n
+    ma5, ma10, ma20 = [None] * n, [None] * n, [None] * n
+    rsi, bb_position = [None] * n, [None] * n  # 缺失值保留为None，输出为null，与日期对齐
+    for i, item in enumerate(daily_data):
+        price = item['price']
+        indicators = item['indicators']
+        dates[i] = item['date'][5:]  # 只取月-日
+        prices[i] = price['close']
+        table_rows[i] = (item['date'], price['open'], price['high'], price['low'])
+        volumes[i] = item['volume']['volume']
+        changes[i] = price['change']
+        amplitudes[i] = price['amplitude']
+        ma5[i] = indicators['ma5']
+        ma10[i] = indicators['ma10']
+        ma20[i] = indicators['ma20']
+        rsi[i] = indicators['rsi']
+        bb_position[i] = indicators['bb_position']
+
+    # 将数据转换为JavaScript数组
+    dates_js = _dumps(dates)
+    prices_js = _dumps(prices)
+    volumes_js = _dumps(volumes)
+    changes_js = _dumps(changes)
+    amplitudes_js = _dumps(amplitudes)
+    ma5_js = _dumps(ma5)
+    ma10_js = _dumps(ma10)
+    ma20_js = _dumps(ma20)
+    rsi_js = _dumps(rsi)
+    bb_position_js = _dumps(bb_position)
+    table_rows_js = _dumps(table_rows)
+
+    # 涨跌幅颜色数组
+    change_colors = _dumps(_change_colors(changes))
+
+    # 生成HTML
+    # 页面头部、摘要与分析洞察（预先计算派生字段并格式化后代入模板）
+    price_change_pct = summary['price_change_pct']
+    volatility = summary['annualized_volatility']
+    trading_days = summary['trading_days']
+    positive_days = summary['positive_days']
+    negative_days = summary['negative_days']
+    min_price = summary['min_price']
+    max_price = summary['max_price']
+    # 无交易日或最低价为0时避免除零
+    win_rate = positive_days / trading_days * 100 if trading_days else 0.0
+    price_range = (max_price / min_price - 1) * 100 if min_price else 0.0
+    head = HEAD_TMPL.substitute(
+        name=stock_info['name'],
+        code=stock_info['code'],
+        period=stock_info['period'],
+        analysis_time=analysis_time,
+        price_change_class='positive' if summary['price_change'] > 0 else 'negative',
+        price_change=f"{summary['price_change']:+.2f}",
+        price_change_pct_class='positive' if price_change_pct > 0 else 'negative',
+        price_change_pct=f"{price_change_pct:+.2f}",
+        trading_days=trading_days,
+        min_price=f"{min_price:.2f}",
+        max_price=f"{max_price:.2f}",
+        total_amount=f"{summary['total_amount']:.0f}",
+        volatility=f"{volatility:.2f}",
+        volatility_level='较高' if volatility > 20 else '中等' if volatility > 15 else '较低',
+        positive_days=positive_days,
+        negative_days=negative_days,
+        win_rate=f"{win_rate:.1f}",
+        trend='呈现上升趋势' if price_change_pct > 2 else '横盘整理' if abs(price_change_pct) <= 2 else '呈现下跌趋势',
+        volatility_type='高波动' if volatility > 20 else '中等波动' if volatility > 15 else '低波动',
+        balance='多头占优' if positive_days > negative_days else '空头占优' if positive_days < negative_days else '多空均衡',
+        max_gain=f"{summary['max_single_day_gain']:+.2f}",
+        max_loss=f"{summary['max_single_day_loss']:+.2f}",
+        price_range=f"{price_range:+.2f}"
+    )
+
+    # 按片段编码写入内存缓冲区，避免再拼接出完整字符串（表格行由浏览器端生成）
+    buf = io.BytesIO()
+    buf.write(head.encode('utf-8'))
+
+    tail = f"""
+                        </tbody>
+                    </table>
+                </div>
+            </div>
+        </div>
+
+        <!-- 页脚 -->
+        <div class="footer">
+            <p>📊 A股行情可视化服务 | 数据生成时间: {generated_at}</p>
+            <p>⚠️ 本数据为演示数据，仅供参考，不构成投资建议</p>
+        </div>
+    </div>
+
+    <script>
+        // 图表配置
+        Chart.defaults.font.family = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif";
+
+        // 数据
+        const dates = {dates_js};
+        const prices = {prices_js};
+        const volumes = {volumes_js};
+        const changes = {changes_js};
+        const amplitudes = {amplitudes_js};
+        const ma5 = {ma5_js};
+        const ma10 = {ma10_js};
+        const ma20 = {ma20_js};
+        const rsi = {rsi_js};
+        const bbPosition = {bb_position_js};
+
+        const tableRows = {table_rows_js};
+
+        // 涨跌幅颜色数组
+        const changeColors = {change_colors};
+"""
+
+    buf.write(tail.encode('utf-8'))
+    buf.write(CHART_SCRIPT_BYTES)
 
     # 保存HTML文件
     if output_html_path is None:
         output_html_path = json_file_path.replace('.json', '_visualization.html')
 
-    with open(output_html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # 一次写入二进制文件
+    with open(output_html_path, 'wb') as f:
+        f.write(buf.getbuffer())
 
     return output_html_path
 
 if __name__ == "__main__":
     # 获取最新的JSON文件
     json_dir = "static"
-    json_files = [f for f in os.listdir(json_dir) if f.startswith('stock_30days_') and f.endswith('.json')]
+    with os.scandir(json_dir) as it:
+        json_files = [e for e in it if e.name.startswith('stock_30days_') and e.name.endswith('.json')]
 
     if json_files:
-        latest_json = max(json_files)
-        json_path = os.path.join(json_dir, latest_json)
+        # 文件名带时间戳，按名称取最新文件
+        json_path = max(json_files, key=lambda e: e.name).path
 
         print(f"🔄 正在生成1个月数据可视化图表...")
         print(f"📄 输入文件: {json_path}")
@@ -866,12 +1003,12 @@ if __name__ == "__main__":
         file_size = os.path.getsize(html_path)
         print(f"📊 文件大小: {file_size/1024:.1f}KB")
 
-        # 自动打开浏览器
-        import subprocess
-        try:
-            subprocess.run(['open', html_path], check=True)
-            print(f"🚀 已在浏览器中打开可视化图表")
-        except:
-            print(f"⚠️  请手动在浏览器中打开: {html_path}")
+        # 自动打开浏览器（跨平台，无需fork外部命令）；批量生成时可用 --no-open/-n 跳过
+        if not {'--no-open', '-n'} & set(sys.argv[1:]):
+            import webbrowser
+            if webbrowser.open('file://' + os.path.abspath(html_path)):
+                print(f"🚀 已在浏览器中打开可视化图表")
+            else:
+                print(f"⚠️  请手动在浏览器中打开: {html_path}")
     else:
         print("❌ 未找到JSON数据文件，请先运行 demo_30days.py 生成数据")
\ No newline at end of file
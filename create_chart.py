@@ -2,245 +2,193 @@
 """
 将JSON交易数据生成为可视化HTML图表
 """
+import gzip
 import json
 import os
+import sys
+from string import Template
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+import numpy as np
 
-def create_visualization_html(json_file_path, output_html_path=None):
-    """
-    将JSON股票数据生成可视化HTML图表
-    """
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-    # 读取JSON数据
-    with open(json_file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    # 提取数据
-    stock_info = data['stock_info']
-    summary = data['summary']
-    daily_data = data['daily_data']
-
-    # 准备图表数据
-    dates = [item['date'][5:] for item in daily_data]  # 只取月-日
-    prices = [item['price']['close'] for item in daily_data]
-    volumes = [item['volume']['volume'] for item in daily_data]
-    changes = [item['price']['change'] for item in daily_data]
-    ma5 = [item['indicators']['ma5'] for item in daily_data]
-    ma20 = [item['indicators']['ma20'] for item in daily_data]
-    rsi = [item['indicators']['rsi'] for item in daily_data if item['indicators']['rsi'] is not None]
-
-    # 生成HTML
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{stock_info['name']}({stock_info['code']}) - {stock_info['period']}交易分析</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-annotation@3.0.1/dist/chartjs-plugin-annotation.min.js"></script>
-    <style>
-        * {{
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 输入JSON超过该大小且安装了ijson时，流式解析daily_data
+STREAM_THRESHOLD = 32 * 1024 * 1024
+
+# 页面静态样式
+PAGE_STYLE = """    <style>
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 20px;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1400px;
             margin: 0 auto;
             background: white;
             border-radius: 20px;
             box-shadow: 0 20px 60px rgba(0,0,0,0.1);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: linear-gradient(135deg, #2c3e50 0%, #3498db 100%);
             color: white;
             padding: 30px;
             text-align: center;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5em;
             margin-bottom: 10px;
             text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }}
+        }
 
-        .header p {{
+        .header p {
             font-size: 1.2em;
             opacity: 0.9;
-        }}
+        }
 
-        .summary {{
+        .summary {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
             gap: 20px;
             padding: 30px;
             background: #f8f9fa;
-        }}
+        }
 
-        .summary-card {{
+        .summary-card {
             background: white;
             padding: 20px;
             border-radius: 15px;
             box-shadow: 0 5px 15px rgba(0,0,0,0.1);
             border-left: 4px solid #3498db;
             transition: transform 0.3s ease;
-        }}
+        }
 
-        .summary-card:hover {{
+        .summary-card:hover {
             transform: translateY(-5px);
-        }}
+        }
 
-        .summary-card h3 {{
+        .summary-card h3 {
             color: #2c3e50;
             margin-bottom: 10px;
             font-size: 1.1em;
-        }}
+        }
 
-        .summary-card .value {{
+        .summary-card .value {
             font-size: 2em;
             font-weight: bold;
             margin: 10px 0;
-        }}
+        }
 
-        .summary-card .change {{
+        .summary-card .change {
             font-size: 1.2em;
-        }}
+        }
 
-        .positive {{
+        .positive {
             color: #27ae60;
-        }}
+        }
 
-        .negative {{
+        .negative {
             color: #e74c3c;
-        }}
+        }
 
-        .charts-container {{
+        .charts-container {
             padding: 30px;
-        }}
+        }
 
-        .chart-section {{
+        .chart-section {
             background: white;
             border-radius: 15px;
             padding: 25px;
             margin-bottom: 30px;
             box-shadow: 0 5px 20px rgba(0,0,0,0.1);
-        }}
+        }
 
-        .chart-section h2 {{
+        .chart-section h2 {
             color: #2c3e50;
             margin-bottom: 20px;
             padding-bottom: 10px;
             border-bottom: 2px solid #3498db;
-        }}
+        }
 
-        .chart-wrapper {{
+        .chart-wrapper {
             position: relative;
             height: 400px;
             margin-bottom: 30px;
-        }}
+        }
 
-        .data-table {{
+        .data-table {
             width: 100%;
             border-collapse: collapse;
             margin-top: 20px;
-        }}
+        }
 
         .data-table th,
-        .data-table td {{
+        .data-table td {
             padding: 12px;
             text-align: center;
             border: 1px solid #dee2e6;
-        }}
+        }
 
-        .data-table th {{
+        .data-table th {
             background: #3498db;
             color: white;
             font-weight: 600;
-        }}
+        }
 
-        .data-table tr:nth-child(even) {{
+        .data-table tr:nth-child(even) {
             background: #f8f9fa;
-        }}
+        }
 
-        .data-table tr:hover {{
+        .data-table tr:hover {
             background: #e3f2fd;
-        }}
+        }
 
-        .footer {{
+        .footer {
             background: #2c3e50;
             color: white;
             text-align: center;
             padding: 20px;
             font-size: 0.9em;
-        }}
+        }
 
-        @media (max-width: 768px) {{
-            .summary {{
+        @media (max-width: 768px) {
+            .summary {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .header h1 {{
+            .header h1 {
                 font-size: 2em;
-            }}
+            }
 
-            .chart-wrapper {{
+            .chart-wrapper {
                 height: 300px;
-            }}
-        }}
+            }
+        }
     </style>
-</head>
-<body>
-    <div class="container">
-        <!-- 头部信息 -->
-        <div class="header">
-            <h1>{stock_info['name']} ({stock_info['code']})</h1>
-            <p>{stock_info['period']} 交易分析报告</p>
-            <p>分析时间: {stock_info['analysis_date'][:19].replace('T', ' ')}</p>
-        </div>
-
-        <!-- 摘要卡片 -->
-        <div class="summary">
-            <div class="summary-card">
-                <h3>💰 价格变化</h3>
-                <div class="value {'positive' if summary['price_change'] > 0 else 'negative'}">
-                    {summary['price_change']:+.2f}元
-                </div>
-                <div class="change {'positive' if summary['price_change_pct'] > 0 else 'negative'}">
-                    ({summary['price_change_pct']:+.2f}%)
-                </div>
-            </div>
-
-            <div class="summary-card">
-                <h3>📊 交易天数</h3>
-                <div class="value">{summary['trading_days']}</div>
-                <div>个交易日</div>
-            </div>
-
-            <div class="summary-card">
-                <h3>📈 价格区间</h3>
-                <div class="value">{summary['min_price']:.2f} - {summary['max_price']:.2f}</div>
-                <div>元</div>
-            </div>
-
-            <div class="summary-card">
-                <h3>💵 总成交额</h3>
-                <div class="value">{summary['total_amount']:.2f}</div>
-                <div>亿元</div>
-            </div>
-        </div>
+"""
 
-        <!-- 图表区域 -->
+# 图表区域与数据表格表头（无插值）
+CHART_SECTIONS = """        <!-- 图表区域 -->
         <div class="charts-container">
             <!-- 价格走势图 -->
             <div class="chart-section">
@@ -293,39 +241,73 @@ def create_visualization_html(json_file_path, output_html_path=None):
                             <th>RSI</th>
                         </tr>
                     </thead>
-                    <tbody>
+                    <tbody id="dataTableBody">
 """
 
-    # 添加数据表格行
-    for item in daily_data:
-        change_class = 'positive' if item['price']['change'] > 0 else 'negative'
-        rsi_value = item['indicators']['rsi'] if item['indicators']['rsi'] is not None else 'N/A'
+# 页面头部、摘要卡片及图表/表格骨架模板（导入时解析一次）
+HEAD_TMPL = Template("""
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>${name}(${code}) - ${period}交易分析</title>
+    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
+    <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-annotation@3.0.1/dist/chartjs-plugin-annotation.min.js"></script>
+""" + PAGE_STYLE + """</head>
+<body>
+    <div class="container">
+        <!-- 头部信息 -->
+        <div class="header">
+            <h1>${name} (${code})</h1>
+            <p>${period} 交易分析报告</p>
+            <p>分析时间: ${analysis_time}</p>
+        </div>
 
-        html_content += f"""
-                        <tr>
-                            <td>{item['date']}</td>
-                            <td>{item['price']['open']:.2f}</td>
-                            <td>{item['price']['high']:.2f}</td>
-                            <td>{item['price']['low']:.2f}</td>
-                            <td>{item['price']['close']:.2f}</td>
-                            <td class="{change_class}">{item['price']['change']:+.2f}%</td>
-                            <td>{item['volume']['volume']:.2f}</td>
-                            <td>{item['volume']['amount']:.2f}</td>
-                            <td>{item['indicators']['ma5']:.2f}</td>
-                            <td>{item['indicators']['ma20']:.2f}</td>
-                            <td>{rsi_value if rsi_value != 'N/A' else 'N/A'}</td>
-                        </tr>
-"""
+        <!-- 摘要卡片 -->
+        <div class="summary">
+            <div class="summary-card">
+                <h3>💰 价格变化</h3>
+                <div class="value ${price_change_class}">
+                    ${price_change}元
+                </div>
+                <div class="change ${price_change_pct_class}">
+                    (${price_change_pct}%)
+                </div>
+            </div>
+
+            <div class="summary-card">
+                <h3>📊 交易天数</h3>
+                <div class="value">${trading_days}</div>
+                <div>个交易日</div>
+            </div>
 
-    html_content += f"""
+            <div class="summary-card">
+                <h3>📈 价格区间</h3>
+                <div class="value">${min_price} - ${max_price}</div>
+                <div>元</div>
+            </div>
+
+            <div class="summary-card">
+                <h3>💵 总成交额</h3>
+                <div class="value">${total_amount}</div>
+                <div>亿元</div>
+            </div>
+        </div>
+
+""" + CHART_SECTIONS)
+
+# 表格收尾、页脚及图表数据模板（图表脚本CHART_SCRIPT含JS模板字符串，单独拼接）
+TAIL_TMPL = Template("""
                     </tbody>
                 </table>
+                <div id="tableSentinel"></div>
             </div>
         </div>
 
         <!-- 页脚 -->
         <div class="footer">
-            <p>📊 A股行情可视化服务 | 数据生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>📊 A股行情可视化服务 | 数据生成时间: ${generated_at}</p>
             <p>⚠️ 本数据为演示数据，仅供参考，不构成投资建议</p>
         </div>
     </div>
@@ -334,231 +316,302 @@ def create_visualization_html(json_file_path, output_html_path=None):
         // 图表配置
         Chart.defaults.font.family = "'Segoe UI', Tahoma, Geneva, Verdana, sans-serif";
 
+        // 数据
+        const dates = ${dates_js};
+        const prices = ${prices_js};
+        const volumes = ${volumes_js};
+        const changes = ${changes_js};
+        const ma5 = ${ma5_js};
+        const ma20 = ${ma20_js};
+        const rsi = ${rsi_js};
+
+        const tableRows = ${table_rows_js};
+
+        // 涨跌幅颜色数组
+        const changeColors = ${change_colors_js};
+""")
+
+# 图表初始化脚本（无插值）
+CHART_SCRIPT = """
+        // 详细数据表格：每次渲染一批行，滚动到表格底部时再追加下一批
+        const TABLE_PAGE_SIZE = 50;
+        const tableBody = document.getElementById('dataTableBody');
+        const tableSentinel = document.getElementById('tableSentinel');
+        let renderedRows = 0;
+        const tableObserver = new IntersectionObserver(entries => {
+            if (entries[0].isIntersecting) {
+                renderNextRows();
+            }
+        });
+        function renderNextRows() {
+            const end = Math.min(renderedRows + TABLE_PAGE_SIZE, tableRows.length);
+            tableBody.insertAdjacentHTML('beforeend', tableRows.slice(renderedRows, end).map(
+                ([date, open, high, low, close, change, volume, amount, ma5Value, ma20Value, rsiValue, changeClass]) => `
+                        <tr>
+                            <td>${date}</td>
+                            <td>${open}</td>
+                            <td>${high}</td>
+                            <td>${low}</td>
+                            <td>${close}</td>
+                            <td class="${changeClass}">${change}%</td>
+                            <td>${volume}</td>
+                            <td>${amount}</td>
+                            <td>${ma5Value}</td>
+                            <td>${ma20Value}</td>
+                            <td>${rsiValue}</td>
+                        </tr>`).join(''));
+            renderedRows = end;
+            // 重新观察以便哨兵仍在视口内时继续加载
+            tableObserver.unobserve(tableSentinel);
+            if (renderedRows < tableRows.length) {
+                tableObserver.observe(tableSentinel);
+            }
+        }
+        renderNextRows();
+
+        // 按统一的选项创建图表，extra可追加插件配置及y轴设置
+        function mkChart(id, type, datasets, titleText, yTitle, extra = {}) {
+            return new Chart(document.getElementById(id).getContext('2d'), {
+                type,
+                data: { labels: dates, datasets },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: {
+                        title: { display: true, text: titleText, font: { size: 16 } },
+                        ...extra.plugins
+                    },
+                    scales: {
+                        y: { title: { display: true, text: yTitle }, ...extra.y }
+                    }
+                }
+            });
+        }
+
         // 价格走势图
-        const priceCtx = document.getElementById('priceChart').getContext('2d');
-        new Chart(priceCtx, {{
-            type: 'line',
-            data: {{
-                labels: {json.dumps(dates)},
-                datasets: [
-                    {{
-                        label: '收盘价',
-                        data: {json.dumps(prices)},
-                        borderColor: '#3498db',
-                        backgroundColor: 'rgba(52, 152, 219, 0.1)',
-                        borderWidth: 3,
-                        fill: true,
-                        tension: 0.1
-                    }},
-                    {{
-                        label: 'MA5',
-                        data: {json.dumps(ma5)},
-                        borderColor: '#e74c3c',
-                        borderWidth: 2,
-                        fill: false
-                    }},
-                    {{
-                        label: 'MA20',
-                        data: {json.dumps(ma20)},
-                        borderColor: '#f39c12',
-                        borderWidth: 2,
-                        fill: false
-                    }}
-                ]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: '价格走势与移动平均线',
-                        font: {{
-                            size: 16
-                        }}
-                    }},
-                    legend: {{
-                        position: 'top'
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        beginAtZero: false,
-                        title: {{
-                            display: true,
-                            text: '价格 (元)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+        mkChart('priceChart', 'line', [
+            { label: '收盘价', data: prices, borderColor: '#3498db', backgroundColor: 'rgba(52, 152, 219, 0.1)', borderWidth: 3, fill: true, tension: 0.1 },
+            { label: 'MA5', data: ma5, borderColor: '#e74c3c', borderWidth: 2, fill: false },
+            { label: 'MA20', data: ma20, borderColor: '#f39c12', borderWidth: 2, fill: false }
+        ], '价格走势与移动平均线', '价格 (元)', {
+            plugins: { legend: { position: 'top' } },
+            y: { beginAtZero: false }
+        });
 
         // 成交量图
-        const volumeCtx = document.getElementById('volumeChart').getContext('2d');
-        new Chart(volumeCtx, {{
-            type: 'bar',
-            data: {{
-                labels: {json.dumps(dates)},
-                datasets: [{{
-                    label: '成交量',
-                    data: {json.dumps(volumes)},
-                    backgroundColor: 'rgba(46, 204, 113, 0.8)',
-                    borderColor: '#27ae60',
-                    borderWidth: 1
-                }}]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: '每日成交量',
-                        font: {{
-                            size: 16
-                        }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        beginAtZero: true,
-                        title: {{
-                            display: true,
-                            text: '成交量 (万股)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+        mkChart('volumeChart', 'bar', [
+            { label: '成交量', data: volumes, backgroundColor: 'rgba(46, 204, 113, 0.8)', borderColor: '#27ae60', borderWidth: 1 }
+        ], '每日成交量', '成交量 (万股)', { y: { beginAtZero: true } });
 
         // 涨跌幅图
-        const changeCtx = document.getElementById('changeChart').getContext('2d');
-        const changeColors = {json.dumps(['#27ae60' if x > 0 else '#e74c3c' for x in changes])};
-        new Chart(changeCtx, {{
-            type: 'bar',
-            data: {{
-                labels: {json.dumps(dates)},
-                datasets: [{
-                    label: '涨跌幅',
-                    data: {json.dumps(changes)},
-                    backgroundColor: changeColors,
-                    borderColor: changeColors,
-                    borderWidth: 1
-                }]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: '每日涨跌幅',
-                        font: {{
-                            size: 16
-                        }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        title: {{
-                            display: true,
-                            text: '涨跌幅 (%)'
-                        }}
-                    }}
-                }}
-            }}
-        }});
-
-        // RSI图
-        const rsiCtx = document.getElementById('rsiChart').getContext('2d');
-        new Chart(rsiCtx, {{
-            type: 'line',
-            data: {{
-                labels: {json.dumps(dates)},
-                datasets: [{
-                    label: 'RSI',
-                    data: {json.dumps(rsi)},
-                    borderColor: '#9b59b6',
-                    backgroundColor: 'rgba(155, 89, 182, 0.1)',
-                    borderWidth: 3,
-                    fill: true,
-                    tension: 0.1
-                }]
-            }},
-            options: {{
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {{
-                    title: {{
-                        display: true,
-                        text: 'RSI相对强弱指标',
-                        font: {{
-                            size: 16
-                        }}
-                    }},
-                    annotation: {{
-                        annotations: {{
-                            line1: {{
-                                type: 'line',
-                                yMin: 70,
-                                yMax: 70,
-                                borderColor: '#e74c3c',
-                                borderWidth: 2,
-                                borderDash: [5, 5],
-                                label: {{
-                                    content: '超卖线 (70)',
-                                    enabled: true
-                                }}
-                            }},
-                            line2: {{
-                                type: 'line',
-                                yMin: 30,
-                                yMax: 30,
-                                borderColor: '#27ae60',
-                                borderWidth: 2,
-                                borderDash: [5, 5],
-                                label: {{
-                                    content: '超买线 (30)',
-                                    enabled: true
-                                }}
-                            }}
-                        }}
-                    }}
-                }},
-                scales: {{
-                    y: {{
-                        min: 0,
-                        max: 100,
-                        title: {{
-                            display: true,
-                            text: 'RSI值'
-                        }}
-                    }}
-                }}
-            }}
-        }});
+        mkChart('changeChart', 'bar', [
+            { label: '涨跌幅', data: changes, backgroundColor: changeColors, borderColor: changeColors, borderWidth: 1 }
+        ], '每日涨跌幅', '涨跌幅 (%)');
+
+        // RSI图（70/30超买超卖参考线）
+        const rsiLine = (value, color, content) => ({
+            type: 'line', yMin: value, yMax: value, borderColor: color, borderWidth: 2, borderDash: [5, 5],
+            label: { content, enabled: true }
+        });
+        mkChart('rsiChart', 'line', [
+            { label: 'RSI', data: rsi, borderColor: '#9b59b6', backgroundColor: 'rgba(155, 89, 182, 0.1)', borderWidth: 3, fill: true, tension: 0.1 }
+        ], 'RSI相对强弱指标', 'RSI值', {
+            plugins: {
+                annotation: {
+                    annotations: {
+                        line1: rsiLine(70, '#e74c3c', '超卖线 (70)'),
+                        line2: rsiLine(30, '#27ae60', '超买线 (30)')
+                    }
+                }
+            },
+            y: { min: 0, max: 100 }
+        });
     </script>
 </body>
 </html>
 """
 
-    # 保存HTML文件
+def _load_json(json_file_path):
+    """读取JSON文件，优先使用orjson解析"""
+    if orjson is not None:
+        with open(json_file_path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(json_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _iter_daily_data(json_file_path):
+    """流式逐条产出daily_data中的记录"""
+    with open(json_file_path, 'rb') as f:
+        yield from ijson.items(f, 'daily_data.item', use_float=True)
+
+def _load_stock_data(json_file_path):
+    """
+    读取股票数据，返回(stock_info, summary, daily_data)
+
+    大文件在安装ijson时流式解析，daily_data为生成器，只能遍历一次
+    """
+    if ijson is not None and os.path.getsize(json_file_path) > STREAM_THRESHOLD:
+        with open(json_file_path, 'rb') as f:
+            stock_info = next(ijson.items(f, 'stock_info', use_float=True))
+            f.seek(0)
+            summary = next(ijson.items(f, 'summary', use_float=True))
+        return stock_info, summary, _iter_daily_data(json_file_path)
+
+    data = _load_json(json_file_path)
+    return data['stock_info'], data['summary'], data['daily_data']
+
+def _dumps(obj):
+    """序列化为紧凑的JSON字符串（用于嵌入JavaScript），优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode('utf-8')
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+def create_visualization_html(json_file_path, output_html_path=None, force=False, write_gzip=True):
+    """
+    将JSON股票数据生成可视化HTML图表
+
+    输出文件已存在且不早于输入JSON时直接返回其路径，force=True时强制重新生成；
+    write_gzip为True时同时生成.html.gz压缩版本，便于静态服务直接返回
+    """
     if output_html_path is None:
         output_html_path = json_file_path.replace('.json', '_visualization.html')
 
-    with open(output_html_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # 输入未变化时跳过重复生成（需要压缩版本时.gz也须存在且不早于输入）
+    if not force:
+        outputs = (output_html_path, output_html_path + '.gz') if write_gzip else (output_html_path,)
+        try:
+            json_mtime = os.stat(json_file_path).st_mtime
+            if all(os.stat(path).st_mtime >= json_mtime for path in outputs):
+                return output_html_path
+        except FileNotFoundError:
+            pass
+
+    # 读取并提取数据
+    stock_info, summary, daily_data = _load_stock_data(json_file_path)
+
+    # 准备图表数据及表格单元格（单次遍历，兼容流式产出的daily_data）
+    # 表格各行预先格式化为单元格字符串，以JSON内嵌由浏览器分批渲染
+    dates, prices, volumes, changes = [], [], [], []
+    ma5, ma20, rsi = [], [], []
+    table_rows = []
+    for item in daily_data:
+        price = item['price']
+        volume = item['volume']
+        indicators = item['indicators']
+        dates.append(item['date'][5:])  # 只取月-日
+        prices.append(price['close'])
+        volumes.append(volume['volume'])
+        changes.append(price['change'])
+        ma5.append(indicators['ma5'])
+        ma20.append(indicators['ma20'])
+        item_rsi = indicators['rsi']
+        if item_rsi is not None:
+            rsi.append(item_rsi)
+            rsi_str = f"{item_rsi:.2f}"
+        else:
+            rsi_str = 'N/A'
+        table_rows.append((
+            item['date'],
+            f"{price['open']:.2f}",
+            f"{price['high']:.2f}",
+            f"{price['low']:.2f}",
+            f"{price['close']:.2f}",
+            f"{price['change']:+.2f}",
+            f"{volume['volume']:.2f}",
+            f"{volume['amount']:.2f}",
+            f"{indicators['ma5']:.2f}",
+            f"{indicators['ma20']:.2f}",
+            rsi_str
+        ))
+
+    # 涨跌幅颜色及表格涨跌样式列（向量化判断涨跌，一次比较共用）
+    change_up = np.asarray(changes) > 0
+    change_colors = np.where(change_up, '#27ae60', '#e74c3c').tolist()
+    change_classes = np.where(change_up, 'positive', 'negative').tolist()
+
+    # 将数据转换为JavaScript数组（每个数组只序列化一次）
+    dates_js = _dumps(dates)
+    prices_js = _dumps(prices)
+    volumes_js = _dumps(volumes)
+    changes_js = _dumps(changes)
+    ma5_js = _dumps(ma5)
+    ma20_js = _dumps(ma20)
+    rsi_js = _dumps(rsi)
+    change_colors_js = _dumps(change_colors)
+
+    # 表格行末尾附加涨跌样式列
+    table_rows_js = _dumps([row + (change_class,) for row, change_class in zip(table_rows, change_classes)])
+
+    # 生成HTML（预先格式化数值后代入模板）
+    head = HEAD_TMPL.substitute(
+        name=stock_info['name'],
+        code=stock_info['code'],
+        period=stock_info['period'],
+        analysis_time=stock_info['analysis_date'][:19].replace('T', ' '),
+        price_change_class='positive' if summary['price_change'] > 0 else 'negative',
+        price_change=f"{summary['price_change']:+.2f}",
+        price_change_pct_class='positive' if summary['price_change_pct'] > 0 else 'negative',
+        price_change_pct=f"{summary['price_change_pct']:+.2f}",
+        trading_days=summary['trading_days'],
+        min_price=f"{summary['min_price']:.2f}",
+        max_price=f"{summary['max_price']:.2f}",
+        total_amount=f"{summary['total_amount']:.2f}"
+    )
+    tail = TAIL_TMPL.substitute(
+        generated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        dates_js=dates_js,
+        prices_js=prices_js,
+        volumes_js=volumes_js,
+        changes_js=changes_js,
+        ma5_js=ma5_js,
+        ma20_js=ma20_js,
+        rsi_js=rsi_js,
+        table_rows_js=table_rows_js,
+        change_colors_js=change_colors_js
+    )
+
+    # 保存HTML文件：各片段依次写入1MiB缓冲的文件，不再拼接完整页面
+    fragments = (head, tail, CHART_SCRIPT)
+    with open(output_html_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(fragments)
+
+    if write_gzip:
+        with gzip.open(output_html_path + '.gz', 'wt', encoding='utf-8', compresslevel=6) as f:
+            f.writelines(fragments)
 
     return output_html_path
 
+def create_visualizations_html(json_file_paths, max_workers=None):
+    """并行批量生成多个可视化HTML图表，返回生成的HTML路径列表"""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(create_visualization_html, json_file_paths))
+
 if __name__ == "__main__":
     # 获取最新的JSON文件
     json_dir = "static"
-    json_files = [f for f in os.listdir(json_dir) if f.startswith('stock_7days_') and f.endswith('.json')]
-
-    if json_files:
-        latest_json = max(json_files)
-        json_path = os.path.join(json_dir, latest_json)
+    batch = '--all' in sys.argv[1:]
+    json_paths = []
+    latest = None
+
+    # 单次遍历目录：批量模式收集全部文件，否则只保留名称最大（时间戳最新）的文件
+    with os.scandir(json_dir) as it:
+        for entry in it:
+            name = entry.name
+            if name.startswith('stock_7days_') and name.endswith('.json'):
+                if batch:
+                    json_paths.append(entry.path)
+                elif latest is None or name > latest.name:
+                    latest = entry
+
+    if json_paths:
+        # 批量生成所有JSON文件对应的图表
+        json_paths.sort()
+        print(f"🔄 正在并行生成 {len(json_paths)} 个可视化图表...")
+
+        for html_path in create_visualizations_html(json_paths):
+            print(f"✅ 可视化文件已生成: {html_path}")
+    elif latest is not None:
+        json_path = latest.path
 
         print(f"🔄 正在生成可视化图表...")
         print(f"📄 输入文件: {json_path}")
@@ -567,5 +620,7 @@ if __name__ == "__main__":
 
         print(f"✅ 可视化文件已生成: {html_path}")
         print(f"🌐 请在浏览器中打开查看: file://{os.path.abspath(html_path)}")
+        if os.path.exists(html_path + '.gz'):
+            print(f"🗜️  压缩版本: {html_path}.gz ({os.path.getsize(html_path + '.gz')/1024:.1f}KB)")
     else:
         print("❌ 未找到JSON数据文件，请先运行 demo_7days.py 生成数据")
\ No newline at end of file
@@ -1,15 +1,18 @@
 """
 FastAPI Web服务接口
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Header
+from fastapi.responses import JSONResponse, FileResponse, Response
 import numpy as np
 import pandas as pd
 import json
+import hashlib
 from pydantic import BaseModel
 from typing import Dict, List, Optional
 import logging
 import os
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 from .analyzer import StockAnalyzer
@@ -69,6 +72,10 @@ visualizer = StockVisualizer()
 index_manager = IndexConstituentsManager()
 constituents_visualizer = IndexConstituentsVisualizer()
 
+# 成分股详细信息响应缓存（LRU，最多Config.DETAILS_CACHE_MAX_ENTRIES条）:
+# (index_name, limit) -> {"ts": 写入时间, "data": 响应数据, "renders": {规范化字段投影: 序列化结果及ETag}}
+_details_cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+
 # 请求模型
 class AnalysisRequest(BaseModel):
     input: str
@@ -523,119 +530,282 @@ async def get_index_analysis(index_name: str):
         logger.error(f"获取指数分析失败: {e}")
         raise HTTPException(status_code=500, detail=f"获取指数分析失败: {str(e)}")
 
-@router.get("/indices/{index_name}/constituents/details")
-async def get_constituents_with_details(index_name: str, limit: Optional[int] = 10, generate_html: Optional[bool] = False):
-    """获取指数成分股详细信息
+def _build_constituents_details(index_name: str, limit: Optional[int] = 10) -> Dict:
+    """构建指数成分股详细信息响应数据，短时间内的重复请求直接返回缓存
 
     Args:
         index_name: 指数名称
-        limit: 限制查询数量，默认10只股票
-        generate_html: 是否生成HTML可视化文件
+        limit: 限制查询数量，最多50只股票
     """
+    return dict(_get_details_entry(index_name, limit)["data"])
+
+def _get_details_entry(index_name: str, limit: Optional[int] = 10) -> Dict:
+    """获取成分股详细信息缓存条目"""
+    # 查询数量限制在1~50之间（未指定时取上限），避免任意limit产生无数缓存键
+    limit = min(max(limit or Config.DETAILS_MAX_LIMIT, 1), Config.DETAILS_MAX_LIMIT)
+
+    cache_key = (index_name, limit)
+    cached = _details_cache.get(cache_key)
+    if cached:
+        age = time.time() - cached["ts"]
+        if age < Config.DETAILS_CACHE_TTL:
+            _details_cache.move_to_end(cache_key)
+            return cached
+        if age >= Config.DETAILS_STALE_SECONDS:
+            # 超出过期容忍时长的条目已无用，直接淘汰
+            del _details_cache[cache_key]
+            cached = None
+
     try:
-        # 限制最大查询数量
-        if limit and limit > 50:
-            limit = 50
+        response_data = _fetch_constituents_details(index_name, limit)
+    except Exception as e:
+        # 数据源异常时返回未超出容忍时长的过期缓存
+        if cached and time.time() - cached["ts"] < Config.DETAILS_STALE_SECONDS:
+            logger.warning(f"获取成分股详细信息失败，返回过期缓存: {index_name}: {e}")
+            return cached
+        raise
 
-        constituents_list = index_manager.get_constituents_with_info(index_name, limit)
+    entry = {"ts": time.time(), "data": response_data, "renders": {}}
+    _details_cache[cache_key] = entry
+    _details_cache.move_to_end(cache_key)
+    while len(_details_cache) > Config.DETAILS_CACHE_MAX_ENTRIES:
+        _details_cache.popitem(last=False)
+    return entry
 
-        if not constituents_list:
-            raise HTTPException(status_code=404, detail=f"未找到指数: {index_name} 或成分股为空")
+def _render_details(entry: Dict, fields: Optional[str] = None) -> Dict:
+    """按字段投影序列化缓存条目，结果随条目缓存
 
-        # 为每个股票添加模拟价格数据（如果没有basic_info或者basic_info没有价格信息）
-        for stock in constituents_list:
-            if 'code' in stock:
-                # 基于股票代码生成一些合理的模拟价格
-                stock_code = str(stock['code']).zfill(6)
-                price_seed = int(stock_code[-4:]) if stock_code[-4:].isdigit() else 1000
-                base_price = 5 + (price_seed % 50) + (price_seed % 10) * 0.1
-                price_change = round((price_seed % 21 - 10) * 0.01, 2)
-                price_change_pct = round(price_change / base_price * 100, 2) if base_price > 0 else 0
+    Args:
+        entry: 成分股详细信息缓存条目
+        fields: 成分股字段列表，逗号分隔，支持 basic_info.最新价 形式的嵌套字段
 
-                # 创建价格数据
-                price_data = {
-                    'current_price': round(base_price, 2),
-                    '最新价': round(base_price, 2),
-                    'price_change': price_change,
-                    'price_change_pct': price_change_pct,
-                    'pe': round(10 + (price_seed % 40), 2) if (price_seed % 3) != 0 else None,
-                    'pb': round(1 + (price_seed % 8) * 0.1, 2) if (price_seed % 5) != 0 else None,
-                    'market_cap': f"{(price_seed % 500 + 50)}亿"
-                }
+    Returns:
+        {"data": 投影后的响应数据, "body": 序列化结果, "etag": ETag}
+    """
+    spec = _parse_fields(fields) if fields else None
+    # 以规范化后的字段规格作为键，字段顺序、空白和重复不同的请求共用同一结果
+    render_key = None if spec is None else tuple(sorted(
+        (key, None if sub_keys is None else tuple(sorted(sub_keys))) for key, sub_keys in spec.items()
+    ))
+    renders = entry["renders"]
+    render = renders.get(render_key)
+    if render is None:
+        data = entry["data"]
+        if spec is not None:
+            data = dict(data)
+            data["constituents"] = [_project_constituent(stock, spec) for stock in data["constituents"]]
+        body = CustomJSONResponse(content=data).body
+        render = {"data": data, "body": body, "etag": f'"{hashlib.md5(body).hexdigest()}"'}
+        renders[render_key] = render
+        # 每个条目最多保留Config.DETAILS_MAX_RENDERS个结果，淘汰最久未使用的
+        while len(renders) > Config.DETAILS_MAX_RENDERS:
+            renders.pop(next(iter(renders)))
+    else:
+        renders[render_key] = renders.pop(render_key)
+    return render
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """判断If-None-Match是否命中当前ETag（支持逗号分隔的多个标签、W/弱校验前缀及*）"""
+    if not if_none_match:
+        return False
+    current = etag.strip('"')
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag.strip('"') == current:
+            return True
+    return False
+
+def _parse_fields(fields: str) -> Dict[str, Optional[set]]:
+    """解析字段列表为 {顶层字段: 嵌套字段集合或None(保留全部)}"""
+    spec: Dict[str, Optional[set]] = {}
+    for field in fields.split(','):
+        field = field.strip()
+        if not field:
+            continue
+        key, _, sub_key = field.partition('.')
+        if not sub_key:
+            spec[key] = None
+        elif key not in spec or spec[key] is not None:
+            spec.setdefault(key, set()).add(sub_key)
+    return spec
+
+def _project_constituent(stock: Dict, spec: Dict[str, Optional[set]]) -> Dict:
+    """按字段规格裁剪单只成分股数据"""
+    projected = {}
+    for key, sub_keys in spec.items():
+        if key not in stock:
+            continue
+        value = stock[key]
+        if sub_keys is not None and isinstance(value, dict):
+            value = {k: value[k] for k in sub_keys if k in value}
+        projected[key] = value
+    return projected
+
+def _fetch_constituents_details(index_name: str, limit: Optional[int]) -> Dict:
+    """从数据源获取成分股详细信息并补充价格数据"""
+    constituents_list = index_manager.get_constituents_with_info(index_name, limit)
+
+    if not constituents_list:
+        raise HTTPException(status_code=404, detail=f"未找到指数: {index_name} 或成分股为空")
+
+    # 为每个股票添加模拟价格数据（如果没有basic_info或者basic_info没有价格信息）
+    for stock in constituents_list:
+        if 'code' in stock:
+            # 基于股票代码生成一些合理的模拟价格
+            stock_code = str(stock['code']).zfill(6)
+            price_seed = int(stock_code[-4:]) if stock_code[-4:].isdigit() else 1000
+            base_price = 5 + (price_seed % 50) + (price_seed % 10) * 0.1
+            price_change = round((price_seed % 21 - 10) * 0.01, 2)
+            price_change_pct = round(price_change / base_price * 100, 2) if base_price > 0 else 0
+
+            # 创建价格数据
+            price_data = {
+                'current_price': round(base_price, 2),
+                '最新价': round(base_price, 2),
+                'price_change': price_change,
+                'price_change_pct': price_change_pct,
+                'pe': round(10 + (price_seed % 40), 2) if (price_seed % 3) != 0 else None,
+                'pb': round(1 + (price_seed % 8) * 0.1, 2) if (price_seed % 5) != 0 else None,
+                'market_cap': f"{(price_seed % 500 + 50)}亿"
+            }
 
-                # 如果basic_info为空，添加模拟数据
-                if not stock.get('basic_info'):
-                    stock['basic_info'] = price_data
-                else:
-                    # 如果basic_info存在但没有价格信息，添加价格信息
-                    basic_info = stock['basic_info']
-                    if not basic_info.get('current_price') and not basic_info.get('最新价'):
-                        basic_info.update(price_data)
+            # 如果basic_info为空，添加模拟数据
+            if not stock.get('basic_info'):
+                stock['basic_info'] = price_data
+            else:
+                # 如果basic_info存在但没有价格信息，添加价格信息
+                basic_info = stock['basic_info']
+                if not basic_info.get('current_price') and not basic_info.get('最新价'):
+                    basic_info.update(price_data)
 
-        # 统计信息
-        successful_count = len([s for s in constituents_list if s.get('basic_info')])
-        failed_count = len(constituents_list) - successful_count
+    # 统计信息
+    successful_count = len([s for s in constituents_list if s.get('basic_info')])
+    failed_count = len(constituents_list) - successful_count
 
-        response_data = {
-            "success": True,
-            "index_name": index_name,
-            "total_count": len(constituents_list),
-            "successful_count": successful_count,
-            "failed_count": failed_count,
-            "constituents": constituents_list
-        }
+    return {
+        "success": True,
+        "index_name": index_name,
+        "total_count": len(constituents_list),
+        "successful_count": successful_count,
+        "failed_count": failed_count,
+        "constituents": constituents_list
+    }
 
-        # 生成HTML可视化文件
-        if generate_html:
-            try:
-                # 创建report目录（如果不存在）
-                os.makedirs(Config.REPORT_DIR, exist_ok=True)
+@router.get("/indices/details")
+async def get_batch_constituents_with_details(names: str, limit: Optional[int] = 10, fields: Optional[str] = None):
+    """批量获取多个指数的成分股详细信息
 
-                # 生成HTML文件名
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                html_filename = f"constituents_details_{index_name}_{timestamp}.html"
-                html_filepath = os.path.join(Config.REPORT_DIR, html_filename)
+    Args:
+        names: 指数名称列表，逗号分隔 (如: 中证100,沪深300)
+        limit: 每个指数限制查询数量，默认10只股票
+        fields: 成分股返回字段，逗号分隔 (如: name,code,basic_info.最新价)，默认返回全部
+    """
+    index_names = [name.strip() for name in names.split(',') if name.strip()]
+    if not index_names:
+        raise HTTPException(status_code=400, detail="指数名称不能为空")
 
-                # 创建详细成分股数据格式
-                detailed_data = {
-                    "success": True,
-                    "index_name": index_name,
-                    "total_count": len(constituents_list),
-                    "returned_count": len(constituents_list),
-                    "constituents": []
-                }
+    indices = {}
+    etags = {}
+    for index_name in dict.fromkeys(index_names):
+        try:
+            render = _render_details(_get_details_entry(index_name, limit), fields)
+            indices[index_name] = dict(render["data"])
+            etags[index_name] = render["etag"]
+        except HTTPException as e:
+            indices[index_name] = {"success": False, "index_name": index_name, "error": e.detail}
+        except Exception as e:
+            logger.error(f"获取成分股详细信息失败: {index_name}: {e}")
+            indices[index_name] = {"success": False, "index_name": index_name, "error": str(e)}
 
-                # 提取基本信息用于可视化
-                for constituent in constituents_list:
-                    basic_info = constituent.get('basic_info', {})
-                    constituent_data = {
-                        'code': constituent.get('code', ''),
-                        'name': constituent.get('name', ''),
-                        'industry': basic_info.get('industry', ''),
-                        'list_date': basic_info.get('list_date', ''),
-                        'market_cap': basic_info.get('market_cap', ''),
-                        'pe': basic_info.get('pe', ''),
-                        'pb': basic_info.get('pb', ''),
-                        'weight': constituent.get('weight', '')
-                    }
-                    detailed_data['constituents'].append(constituent_data)
+    return {
+        "success": True,
+        "count": len(indices),
+        "indices": indices,
+        "etags": etags
+    }
 
-                # 生成HTML
-                constituents_visualizer.generate_constituents_html(
-                    constituents_data=detailed_data,
-                    index_name=f"{index_name} - 详细分析",
-                    output_file=html_filepath
-                )
+@router.get("/indices/{index_name}/constituents/details")
+async def get_constituents_with_details(index_name: str, limit: Optional[int] = 10, generate_html: Optional[bool] = False,
+                                        fields: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """获取指数成分股详细信息
 
-                # 添加HTML文件路径到响应
-                response_data["html_file"] = html_filename
-                response_data["html_url"] = f"/api/v1/report/{html_filename}"
+    Args:
+        index_name: 指数名称
+        limit: 限制查询数量，默认10只股票
+        generate_html: 是否生成HTML可视化文件
+        fields: 成分股返回字段，逗号分隔 (如: name,code,basic_info.最新价)，默认返回全部；
+            HTML报告使用固定字段，不能与generate_html同时指定，否则返回400
+        if_none_match: 客户端缓存的ETag，未变化时返回304
+    """
+    try:
+        if generate_html and fields:
+            raise HTTPException(status_code=400, detail="fields参数不能与generate_html同时使用")
 
-                logger.info(f"已生成指数详细成分股HTML文件: {html_filepath}")
+        if not generate_html:
+            # 使用缓存的序列化结果，ETag匹配时无需传输响应体
+            render = _render_details(_get_details_entry(index_name, limit), fields)
+            headers = {"ETag": render["etag"]}
+            if _etag_matches(if_none_match, render["etag"]):
+                return Response(status_code=304, headers=headers)
+            return Response(content=render["body"], media_type="application/json", headers=headers)
 
-            except Exception as e:
-                logger.error(f"生成HTML文件失败: {e}")
-                # 不影响API响应，继续返回JSON数据
+        response_data = _build_constituents_details(index_name, limit)
+        constituents_list = response_data["constituents"]
+
+        # 生成HTML可视化文件
+        try:
+            # 创建report目录（如果不存在）
+            os.makedirs(Config.REPORT_DIR, exist_ok=True)
+
+            # 生成HTML文件名
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            html_filename = f"constituents_details_{index_name}_{timestamp}.html"
+            html_filepath = os.path.join(Config.REPORT_DIR, html_filename)
+
+            # 创建详细成分股数据格式
+            detailed_data = {
+                "success": True,
+                "index_name": index_name,
+                "total_count": len(constituents_list),
+                "returned_count": len(constituents_list),
+                "constituents": []
+            }
+
+            # 提取基本信息用于可视化
+            for constituent in constituents_list:
+                basic_info = constituent.get('basic_info', {})
+                constituent_data = {
+                    'code': constituent.get('code', ''),
+                    'name': constituent.get('name', ''),
+                    'industry': basic_info.get('industry', ''),
+                    'list_date': basic_info.get('list_date', ''),
+                    'market_cap': basic_info.get('market_cap', ''),
+                    'pe': basic_info.get('pe', ''),
+                    'pb': basic_info.get('pb', ''),
+                    'weight': constituent.get('weight', '')
+                }
+                detailed_data['constituents'].append(constituent_data)
+
+            # 生成HTML
+            constituents_visualizer.generate_constituents_html(
+                constituents_data=detailed_data,
+                index_name=f"{index_name} - 详细分析",
+                output_file=html_filepath
+            )
+
+            # 添加HTML文件路径到响应
+            response_data["html_file"] = html_filename
+            response_data["html_url"] = f"/api/v1/report/{html_filename}"
+
+            logger.info(f"已生成指数详细成分股HTML文件: {html_filepath}")
+
+        except Exception as e:
+            logger.error(f"生成HTML文件失败: {e}")
+            # 不影响API响应，继续返回JSON数据
 
         return response_data
 
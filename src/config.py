@@ -11,6 +11,13 @@ class Config:
     MAX_STOCKS = 500  # 最大股票数量
     RATE_LIMIT = 60  # 每分钟最大请求数
 
+    # 成分股详细信息接口响应缓存
+    DETAILS_CACHE_TTL = 30  # 响应缓存有效期（秒）
+    DETAILS_STALE_SECONDS = 600  # 数据源异常时可返回的过期缓存时长（秒）
+    DETAILS_CACHE_MAX_ENTRIES = 64  # 缓存条目上限，超出时淘汰最久未使用的条目
+    DETAILS_MAX_LIMIT = 50  # 单个指数最多查询的成分股数量
+    DETAILS_MAX_RENDERS = 8  # 每个缓存条目保留的字段投影序列化结果上限
+
     # 指数映射
     INDEX_MAPPING = {
         "上证100": "SSE100",
@@ -0,0 +1,208 @@
+"""
+演示脚本（近1个月/近半年）共用的分析与输出逻辑
+"""
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .indicators import TechnicalIndicators
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from joblib import Memory
+except ImportError:
+    Memory = None
+
+
+# 磁盘缓存目录固定在项目根目录下，不随运行时的工作目录变化
+DISK_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static", ".cache")
+
+
+@lru_cache(maxsize=None)
+def _generator_version(generator: Callable) -> str:
+    """生成函数源码的摘要，修改生成逻辑后磁盘缓存随之失效"""
+    try:
+        source = inspect.getsource(generator)
+    except (OSError, TypeError):
+        source = generator.__code__.co_code.hex()
+    return hashlib.md5(source.encode('utf-8')).hexdigest()
+
+
+def _build_with_indicators(generator: Callable, code: str, name: str, days: int, today: str,
+                           version: str) -> pd.DataFrame:
+    """生成模拟数据并计算技术指标（today与version仅作为缓存键：日期序列随当天变化，version随生成函数源码变化）"""
+    df = generator(code, name, days=days)
+    return TechnicalIndicators.calculate_basic_indicators(df)
+
+# 进程内按(生成函数, code, days, 当天日期, 源码摘要)缓存；安装joblib时再叠加磁盘缓存，命令行重复运行可直接命中
+if Memory is not None:
+    _build_with_indicators = Memory(location=DISK_CACHE_DIR, verbose=0).cache(_build_with_indicators)
+_cached_with_indicators = lru_cache(maxsize=32)(_build_with_indicators)
+
+
+def load_with_indicators(generator: Callable, code: str, name: str, days: int) -> pd.DataFrame:
+    """获取带技术指标的模拟数据（结果已缓存，调用方只读使用）"""
+    return _cached_with_indicators(generator, code, name, days, date.today().isoformat(),
+                                   _generator_version(generator))
+
+
+def recent_window(df: pd.DataFrame, days: int) -> pd.DataFrame:
+    """截取最近days天的数据副本（日期已按从早到晚排序，二分定位起点后连续切片）"""
+    dates = df['date']
+    start_date = dates.iloc[-1] - timedelta(days=days)
+    return df.iloc[dates.searchsorted(start_date):].copy()
+
+
+def volume_stats(df: pd.DataFrame) -> Dict:
+    """成交量统计：均值、标准差、极值及其日期、总成交额"""
+    vol = df['volume'].to_numpy()
+    imax, imin = int(vol.argmax()), int(vol.argmin())  # 按位置定位最大/最小成交量
+    return {
+        'avg_volume': vol.mean(),
+        'volume_std': vol.std(ddof=1),
+        'max_volume': vol[imax],
+        'min_volume': vol[imin],
+        'max_volume_date': df['date'].iloc[imax].strftime('%m-%d'),
+        'min_volume_date': df['date'].iloc[imin].strftime('%m-%d'),
+        'total_amount': df['amount'].sum()
+    }
+
+
+def period_stats(df: pd.DataFrame) -> Dict:
+    """区间统计：价格变化、价格区间、单日极值、涨跌天数、均值与标准差"""
+    first_close = df['close'].iloc[0]
+    price_change = df['close'].iloc[-1] - first_close
+    chg = df['change_pct'].to_numpy()  # 涨跌幅列只取一次，后续统计复用
+    return {
+        'price_change': price_change,
+        'price_change_pct': (price_change / first_close) * 100,
+        'max_price': df['high'].max(),
+        'min_price': df['low'].min(),
+        'max_single_day_gain': chg.max(),
+        'max_single_day_loss': chg.min(),
+        'positive_days': int(np.count_nonzero(chg > 0)),
+        'negative_days': int(np.count_nonzero(chg < 0)),
+        'volatility': chg.std(ddof=1),  # 与pandas一致使用样本标准差
+        'mean_change': chg.mean()
+    }
+
+
+def print_period_stats(stats: Dict, trading_days: int) -> None:
+    """打印区间统计（价格变化、区间、涨跌天数）"""
+    max_price, min_price = stats['max_price'], stats['min_price']
+    positive_days, negative_days = stats['positive_days'], stats['negative_days']
+    print(f"  价格变化: {stats['price_change']:+.2f}元 ({stats['price_change_pct']:+.2f}%)")
+    print(f"  价格区间: {min_price:.2f} - {max_price:.2f}元 (振幅: {((max_price/min_price-1)*100):+.2f}%)")
+    print(f"  单日最大涨幅: {stats['max_single_day_gain']:+.2f}%")
+    print(f"  单日最大跌幅: {stats['max_single_day_loss']:+.2f}%")
+    print(f"  上涨天数: {positive_days}天 ({positive_days/trading_days*100:.1f}%)")
+    print(f"  下跌天数: {negative_days}天 ({negative_days/trading_days*100:.1f}%)")
+    print(f"  平盘天数: {trading_days-positive_days-negative_days}天")
+
+
+def print_latest_indicators(latest: pd.Series, ma_columns: Sequence[str]) -> None:
+    """打印最新一日的价格与技术指标"""
+    print(f"  最新价格: {latest['close']:.2f}元")
+    for col in ma_columns:
+        print(f"  {col + ':':<10}{latest.get(col, 'N/A'):.2f}")
+    print(f"  RSI:      {latest.get('RSI', 'N/A'):.2f}" if pd.notna(latest.get('RSI')) else "  RSI:      N/A")
+    print(f"  MACD:     {latest.get('MACD', 'N/A'):.4f}" if pd.notna(latest.get('MACD')) else "  MACD:     N/A")
+    print(f"  布林带位置: {latest.get('BB_Position', 'N/A'):.1f}%" if pd.notna(latest.get('BB_Position')) else "  布林带位置: N/A")
+
+
+# 每日详细数据各列输出的小数位数（均线列统一保留2位）
+DAILY_DECIMALS = {
+    'open': 2, 'high': 2, 'low': 2, 'close': 2, 'change_pct': 2, 'amplitude': 2,
+    'volume': 2, 'amount': 2, 'turnover': 2,
+    'RSI': 2, 'MACD': 4, 'BB_Position': 1, 'Volume_Ratio': 2
+}
+
+
+def daily_records(df: pd.DataFrame, ma_columns: Sequence[str], stride: int = 1) -> List[Dict]:
+    """按步长采样生成每日详细数据（整列一次舍入，再按位置组装，避免逐行构造Series）"""
+    sampled = df.iloc[::stride]
+    rounded = sampled.round(dict(DAILY_DECIMALS, **{col: 2 for col in ma_columns}))
+
+    def column(col, default=None):
+        """取舍入后的整列数据，缺失的指标列用默认值填充"""
+        return rounded[col].tolist() if col in rounded else [default] * len(rounded)
+
+    def nullable(col):
+        """取可空指标列，NaN整列一次替换为None"""
+        if col not in rounded:
+            return [None] * len(rounded)
+        values = rounded[col].to_numpy(dtype=np.float64)
+        return np.where(np.isnan(values), None, values).tolist()
+
+    date_strs = sampled['date'].dt.strftime('%Y-%m-%d').tolist()  # 整列一次格式化
+    opens, highs, lows, closes = column('open'), column('high'), column('low'), column('close')
+    changes, amplitudes = column('change_pct'), column('amplitude')
+    volumes, amounts, turnovers = column('volume'), column('amount'), column('turnover')
+    mas = [(col.lower(), column(col, 0)) for col in ma_columns]
+    rsi, macd = nullable('RSI'), nullable('MACD')
+    bb_position, volume_ratio = nullable('BB_Position'), nullable('Volume_Ratio')
+
+    records = []
+    for i, date_str in enumerate(date_strs):
+        indicators = {key: values[i] for key, values in mas}
+        indicators.update({
+            "rsi": rsi[i],
+            "macd": macd[i],
+            "bb_position": bb_position[i],
+            "volume_ratio": volume_ratio[i]
+        })
+        records.append({
+            "date": date_str,
+            "price": {
+                "open": opens[i],
+                "high": highs[i],
+                "low": lows[i],
+                "close": closes[i],
+                "change": changes[i],
+                "amplitude": amplitudes[i]
+            },
+            "volume": {
+                "volume": volumes[i],
+                "amount": amounts[i],
+                "turnover": turnovers[i]
+            },
+            "indicators": indicators
+        })
+    return records
+
+
+def write_json(output_file: str, data: dict) -> None:
+    """写出分析结果JSON，优先使用orjson直接写入字节（NaN写为null）"""
+    if orjson is not None:
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        return
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+# 结果文件由单线程后台写出，调用方可继续输出；进程退出前会等待写完
+_io_pool = ThreadPoolExecutor(max_workers=1)
+
+
+def save_result(prefix: str, code: str, data: dict) -> Tuple[str, Future]:
+    """
+    在后台线程保存分析结果到static目录
+
+    返回文件路径和写入任务的Future；提交后data不应再被修改
+    """
+    output_file = f"static/{prefix}_{code}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs("static", exist_ok=True)
+    return output_file, _io_pool.submit(write_json, output_file, data)
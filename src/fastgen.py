@@ -0,0 +1,51 @@
+"""
+模拟行情生成的数值内核
+"""
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _compound_py(base: float, changes: np.ndarray, lo: float, hi: float) -> np.ndarray:
+    """
+    逐日复利并在每一步限制价格区间（纯NumPy实现）
+
+    先用累乘一次算出未触及边界的路径，只有越界后才从越界点起逐日递推
+    """
+    if not len(changes):
+        return np.empty(0)
+    growth = 1 + changes
+    growth[0] = base
+    out = np.cumprod(growth)
+    hit = np.flatnonzero((out[1:] < lo) | (out[1:] > hi))
+    if hit.size:
+        p = out[hit[0]]
+        for i in range(hit[0] + 1, len(out)):
+            p = min(max(p * (1 + changes[i]), lo), hi)
+            out[i] = p
+    return out
+
+
+if njit is not None:
+    @njit('float64[:](float64, float64[:], float64, float64)', cache=True)
+    def compound_prices(base, changes, lo, hi):
+        """逐日复利并在每一步限制价格区间，首日为基准价格"""
+        n = changes.shape[0]
+        out = np.empty(n)
+        if n == 0:
+            return out
+        p = base
+        out[0] = p
+        for i in range(1, n):
+            p = out[i - 1] * (1 + changes[i])
+            if p < lo:
+                p = lo
+            elif p > hi:
+                p = hi
+            out[i] = p
+        return out
+else:
+    compound_prices = _compound_py
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试成分股详细信息接口（ETag条件请求、批量接口、字段投影）
+"""
+import sys
+import os
+from contextlib import contextmanager
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import src.api as api
+
+
+class StubIndexManager:
+    """模拟指数成分股管理器，不访问外部数据源"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_constituents_with_info(self, index_name, limit=None):
+        self.calls.append((index_name, limit))
+        if index_name == "不存在的指数":
+            return []
+        return [{"code": f"00000{i}", "name": f"股票{i}"} for i in range(1, (limit or 3) + 1)]
+
+
+@contextmanager
+def _stubbed_client():
+    """创建挂载API路由的测试客户端，临时替换数据源；退出时恢复原数据源并清空响应缓存"""
+    original = api.index_manager
+    api.index_manager = StubIndexManager()
+    api._details_cache.clear()
+    try:
+        app = FastAPI()
+        app.include_router(api.router, prefix="/api/v1")
+        yield TestClient(app)
+    finally:
+        api.index_manager = original
+        api._details_cache.clear()
+
+
+def test_details_etag_revalidation():
+    """测试首次请求返回200和ETag，携带ETag再次请求返回304"""
+    with _stubbed_client() as client:
+        url = "/api/v1/indices/中证100/constituents/details?limit=3"
+
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+        assert response.json()["total_count"] == 3
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+        # ETag不匹配时返回完整响应
+        response = client.get(url, headers={"If-None-Match": '"stale"'})
+        assert response.status_code == 200
+
+        # 逗号分隔列表、W/弱校验前缀及*均视为命中
+        for header in (f'"stale", {etag}', f"W/{etag}", "*"):
+            response = client.get(url, headers={"If-None-Match": header})
+            assert response.status_code == 304
+
+        # 缓存有效期内只访问一次数据源
+        assert api.index_manager.calls == [("中证100", 3)]
+        print("✅ ETag条件请求测试通过")
+
+
+def test_batch_details_with_bad_index():
+    """测试批量接口中单个指数失败不影响其他指数"""
+    with _stubbed_client() as client:
+        response = client.get("/api/v1/indices/details", params={"names": "中证100,不存在的指数", "limit": 2})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert data["count"] == 2
+
+        good = data["indices"]["中证100"]
+        assert good["success"] is True
+        assert len(good["constituents"]) == 2
+
+        bad = data["indices"]["不存在的指数"]
+        assert bad["success"] is False
+        assert "不存在的指数" in bad["error"]
+
+        assert "中证100" in data["etags"]
+        assert "不存在的指数" not in data["etags"]
+        print("✅ 批量接口测试通过")
+
+
+def test_details_fields_projection():
+    """测试fields参数只返回指定字段及basic_info中的嵌套字段"""
+    with _stubbed_client() as client:
+        response = client.get("/api/v1/indices/中证100/constituents/details",
+                              params={"limit": 2, "fields": "code,basic_info.最新价"})
+        assert response.status_code == 200
+        constituents = response.json()["constituents"]
+        assert len(constituents) == 2
+        for stock in constituents:
+            assert set(stock) == {"code", "basic_info"}
+            assert set(stock["basic_info"]) == {"最新价"}
+            assert isinstance(stock["basic_info"]["最新价"], float)
+
+        # 字段顺序不同的等价请求共用同一序列化结果
+        reordered = client.get("/api/v1/indices/中证100/constituents/details",
+                               params={"limit": 2, "fields": "basic_info.最新价, code"})
+        assert reordered.headers["ETag"] == response.headers["ETag"]
+
+        # HTML报告使用固定字段，与fields同时指定时拒绝请求
+        response = client.get("/api/v1/indices/中证100/constituents/details",
+                              params={"limit": 2, "fields": "code", "generate_html": True})
+        assert response.status_code == 400
+        print("✅ 字段投影测试通过")
+
+
+if __name__ == "__main__":
+    test_details_etag_revalidation()
+    test_batch_details_with_bad_index()
+    test_details_fields_projection()